@@ -26,9 +26,15 @@ The matching pipeline has three tiers:
 Anything uncertain yields None - correctness is prioritized over guessing.
 """
 
+import functools
+import numbers
 import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
 
 # --- Type aliases ---------------------------------------------------------
 
@@ -36,10 +42,15 @@ from typing import Any, Dict, List, Optional, Set, Union
 Attachment = Dict[str, Any]
 Transaction = Dict[str, Any]
 
+# A transaction or attachment with its matching fields parsed once:
+# (item, absolute amount in cents, dates as day ordinals, normalized counterparties, normalized reference)
+_Prepared = Tuple[Any, Optional[int], Tuple[int, ...], FrozenSet[str], Optional[str]]
+
 # --- Global constants -----------------------------------------------------
 
 # A +/-14 day window for comparing transaction dates with invoice/receipt dates.
 DATE_WINDOW = timedelta(days=14)
+_DATE_WINDOW_DAYS = DATE_WINDOW.days    # same window, for comparing day ordinals
 
 # The user's own company. used to filter out own company name from attachments.
 OUR_COMPANY_NAME = "Example Company Oy"
@@ -47,25 +58,59 @@ OUR_COMPANY_NAME = "Example Company Oy"
 # A match is only "confident" if at least 2 of the 3 signals (Amount, Date, Name) match.
 CONFIDENCE_THRESHOLD = 2
 
+# The highest possible heuristic score: all three signals agree.
+MAX_SCORE = 3
+
+# Business suffixes stripped from counterparty names.
+_SUFFIXES = frozenset({'oy', 'ab', 'ltd', 'inc', 'gmbh', 'tmi'})
+
+# Precompiled patterns used by the normalization helpers.
+# All business suffixes are removed in a single pass instead of one re.sub per suffix.
+_SUFFIX_RE = re.compile(r'\b(?:' + '|'.join(sorted(_SUFFIXES)) + r')\b', re.IGNORECASE)
+_PUNCT_RE = re.compile(r'[^a-z0-9äöå]+')
+_WS_RE = re.compile(r'\s+')
+
+# Translation table for the ASCII fast path of _normalize_name: lowercases letters,
+# keeps word characters (a-z, 0-9, '_') and turns everything else into a space.
+# '_' must survive until after suffix removal: the regex path's \b treats '_' as a word
+# character, so "ab_c" keeps its "ab". Both paths produce identical output only with this rule.
+_ASCII_NAME_TABLE = {
+    c: (chr(c).lower() if chr(c).isalnum() or chr(c) == '_' else ' ')
+    for c in range(128)
+}
+
+# Shared read-only stand-in for a missing attachment 'data' field,
+# so lookups don't allocate a fresh {} every time.
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+_EMPTY_FROZENSET: FrozenSet[str] = frozenset()
+
 
 # --- Helper function: Reference number normalization -------------------------------
 
-def _normalize_ref(ref: Optional[str]) -> Optional[str]:
+def _normalize_ref(ref: Any) -> Optional[str]:
     """
     Normalizes a reference number so it can be compared reliably.
 
     - Strips whitespace everywhere.
     - Removes leading zeros.
-    - Returns None for empty or meaningless values.
+    - Returns None for empty, meaningless or non-string values.
 
     This allows:
        " 00123 " -> "123"
        "000"     -> None
     """
-    if not ref:
+    if not ref or not isinstance(ref, str):
         return None
 
-    ref = re.sub(r'\s+', '', ref)   # remove all whitespace
+    return _normalize_ref_str(ref)
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_ref_str(ref: str) -> Optional[str]:
+    """
+    The cached part of _normalize_ref(), for input already known to be a non-empty string.
+    """
+    ref = _WS_RE.sub('', ref)       # remove all whitespace
     ref = ref.lstrip('0')           # remove leading zeros
 
     return ref or None              # empty -> None
@@ -73,7 +118,7 @@ def _normalize_ref(ref: Optional[str]) -> Optional[str]:
 
 # --- Helper function: Name normalization -------------------------------------------
 
-def _normalize_name(name: Optional[str]) -> Optional[str]:
+def _normalize_name(name: Any) -> Optional[str]:
     """
     Normalizes names to allow consistent comparison of counterparties.
 
@@ -82,218 +127,271 @@ def _normalize_name(name: Optional[str]) -> Optional[str]:
       - removes known business suffixes (oy, ltd, tmi etc.)
       - replaces non-alphanumeric characters with spaces
       - strips leading/trailing whitespace.
+
+    The result is interned (sys.intern), so repeated vendor names share one string object
+    and set lookups can succeed on an identity check. This is safe because the set of
+    distinct counterparty names is small. Returns None for non-string values
+    and if nothing is left after normalization.
     """
-    if not name:
+    if not name or not isinstance(name, str):
         return None
 
-    name = name.lower()
+    return _normalize_name_str(name)
+
 
-    # Remove common business suffixes
-    suffixes = [r'\boy\b', r'\bab\b', r'\bltd\b', r'\binc\b', r'\bgmbh\b', r'\btmi\b']
-    for suffix in suffixes:
-        name = re.sub(suffix, '', name, flags=re.IGNORECASE)
+@functools.lru_cache(maxsize=4096)
+def _normalize_name_str(name: str) -> Optional[str]:
+    """
+    The cached part of _normalize_name(), for input already known to be a non-empty string.
+    """
+    if name.isascii():
+        # Fast path for the common case: one C-level translate and split, no regex.
+        words = name.translate(_ASCII_NAME_TABLE).split()
+        name = ' '.join(w for w in words if w not in _SUFFIXES)
+        if '_' in name:
+            name = ' '.join(name.replace('_', ' ').split())
+    else:
+        # Remove common business suffixes
+        name = _SUFFIX_RE.sub('', name.lower())
 
-    # Normalize punctuation to space. Keep Nordic characters.
-    name = re.sub(r'[^a-z0-9äöå]+', ' ', name)
+        # Normalize punctuation to space. Keep Nordic characters.
+        name = _PUNCT_RE.sub(' ', name).strip()
 
-    return name.strip()
+    return sys.intern(name) if name else None
+
+
+# Our own company name never changes, so normalize it once at import.
+_OUR_NAME_NORM = _normalize_name(OUR_COMPANY_NAME)
 
 
 # --- Helper function: Extract attachment counterparties ----------------------------
 
-def _get_att_counterparties(att: Attachment) -> Set[str]:
+def _get_att_counterparties(att_data: Mapping[str, Any]) -> FrozenSet[str]:
     """
-    Returns a set of all normalized party names mentioned in an attachment
+    Returns a set of all normalized party names mentioned in an attachment's data
     (supplier, issuer, recipient) excluding the company's own name.
 
     This avoids incorrectly treating the user's company as the counterparty.
     """
-    att_data = att.get('data', {})
-    raw_parties = [
+    raw_parties = (
         att_data.get('supplier'),
         att_data.get('issuer'),
         att_data.get('recipient')
-    ]
-
-    our_name_norm = _normalize_name(OUR_COMPANY_NAME)
-    normalized = set()
+    )
+    if not any(raw_parties):
+        return _EMPTY_FROZENSET     # no party data at all (common in raw receipts)
 
-    for p in raw_parties:
-        norm = _normalize_name(p)
-        if norm and norm != our_name_norm:
-            normalized.add(norm)
+    normalized = frozenset(
+        norm for norm in map(_normalize_name, raw_parties)
+        if norm and norm != _OUR_NAME_NORM
+    )
 
     return normalized
 
 
-# --- Helper function: Amount match -------------------------------------------------
+# --- Helper function: Amount parsing ----------------------------------------------
 
-def _check_amount_match(tx: Transaction, att: Attachment) -> bool:
+def _parse_amount(value: Any) -> Optional[int]:
     """
-    Returns "True" if the absolute values of transaction.amount and attachment.total_amount match.
+    Returns the absolute value of an amount in integer cents, or None if it is missing or non-numeric.
 
     Transactions may be negative (-50.00) while invoices are positive (50.00). so absolute-value comparison is used.
+    Comparing whole cents avoids float equality pitfalls such as 0.1 + 0.2 != 0.3.
+    Decimal commas ("50,00") are accepted as well, and so is any numeric type,
+    including decimal.Decimal (e.g. from json.load(..., parse_float=Decimal)).
     """
+    if isinstance(value, str):
+        value = value.strip().replace(',', '.')
+        if not value:
+            return None
+    elif not isinstance(value, numbers.Number):
+        return None     # missing (None) or unsupported type
+
     try:
-        tx_amount = float(tx.get('amount'))
-        att_amount = float(att.get('data', {}).get('total_amount'))
-    except (TypeError, ValueError, AttributeError):
-        return False    # handle missing or non-numeric data (None or "")
+        return int(round(abs(float(value)) * 100))
+    except (TypeError, ValueError, OverflowError):
+        return None     # non-numeric text, complex numbers, NaN or infinity
+
+
+# --- Helper function: Date parsing -------------------------------------------------
 
-    return abs(tx_amount) == abs(att_amount)
+def _parse_date_ordinal(value: Any) -> Optional[int]:
+    """
+    Parses an ISO-8601 date string into a day ordinal (date.toordinal()). Returns None for missing or malformed values.
+
+    Plain ints let the matcher compare dates with integer arithmetic instead of building timedelta objects.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value).toordinal()
+    except ValueError:
+        return None
 
 
 # --- Helper function: Date match ---------------------------------------------------
 
-def _check_date_match(tx: Transaction, att: Attachment) -> bool:
+def _date_window(dates: Tuple[int, ...]) -> FrozenSet[int]:
     """
-    Returns "True" if the transaction date is within a 14 day window of any attachment date: invoicing_date, due_date, or receiving_date.
+    Returns every day ordinal within a 14 day window of any of the given dates.
+
+    A transaction has a single date, while an attachment may carry several (invoicing_date, due_date, receiving_date).
     The presence of multiple possible attachment dates is common in invoices/receipts.
+    Built once for the item being matched, so each candidate's date check is a single
+    set intersection test (`not window.isdisjoint(candidate_dates)`) instead of a Python loop.
     """
-    try:
-        tx_date_str = tx.get('date')
-        if not tx_date_str:
-            return False
-
-        tx_date = datetime.fromisoformat(tx_date_str).date()
-    except Exception:
-        return False
-
-    # Create a list of all possible dates to check on the attachment
-    att_dates_str = [
-        att.get('data', {}).get('invoicing_date'),
-        att.get('data', {}).get('due_date'),
-        att.get('data', {}).get('receiving_date')
-    ]
+    return frozenset(
+        day
+        for d in dates
+        for day in range(d - _DATE_WINDOW_DAYS, d + _DATE_WINDOW_DAYS + 1)
+    )
 
-    for date_str in att_dates_str:
-        if not date_str:
-            continue    # Skip missing date fields
-        try:
-            att_date = datetime.fromisoformat(date_str).date()
-            # Return True on the first date that falls within the window
-            if abs(tx_date - att_date) <= DATE_WINDOW:
-                return True
-        except Exception:
-            continue
 
-    return False
+# --- Helper functions: Candidate preparation ---------------------------------------
+
+def _prepare_transaction(tx: Transaction) -> _Prepared:
+    """
+    Parses the matching fields of a transaction once, so they are not re-parsed for every comparison.
+    """
+    tx_date = _parse_date_ordinal(tx.get('date'))
+    tx_party_norm = _normalize_name(tx.get('contact'))
+
+    return (
+        tx,
+        _parse_amount(tx.get('amount')),
+        (tx_date,) if tx_date is not None else (),
+        frozenset([tx_party_norm]) if tx_party_norm else _EMPTY_FROZENSET,
+        _normalize_ref(tx.get('reference')),
+    )
+
 
+def _prepare_attachment(att: Attachment) -> _Prepared:
+    """
+    Parses the matching fields of an attachment once, so they are not re-parsed for every comparison.
+    """
+    att_data = att.get('data') or _EMPTY    # fetched once and shared by every field below
+    att_dates = (
+        _parse_date_ordinal(att_data.get('invoicing_date')),
+        _parse_date_ordinal(att_data.get('due_date')),
+        _parse_date_ordinal(att_data.get('receiving_date'))
+    )
+
+    return (
+        att,
+        _parse_amount(att_data.get('total_amount')),
+        tuple(d for d in att_dates if d is not None),   # skip missing date fields
+        _get_att_counterparties(att_data),
+        _normalize_ref(att_data.get('reference')),
+    )
 
-# --- Helper function: Counterparty match ------------------------------------------
 
-def _check_counterparty_match(tx: Transaction, att: Attachment) -> bool:
+# --- Reference index ---------------------------------------------------------
+
+def build_attachment_index(attachments: List[Attachment]) -> Dict[str, Attachment]:
     """
-    Returns "True" if the transaction's 'contact' matches any counterparties on the attachment.
+    Maps each normalized attachment reference to its attachment.
+
+    Build this once and pass it to find_attachment() when matching many transactions
+    against the same attachments, so Stage 1 becomes a single dict lookup.
+    Attachments without a usable reference are left out; on duplicates the first one wins.
     """
-    tx_party_norm = _normalize_name(tx.get('contact'))
-    if not tx_party_norm:
-        # Transaction has no contact name, so we can't check.
-        return False
+    index: Dict[str, Attachment] = {}
+    for att in attachments:
+        ref = _normalize_ref((att.get('data') or _EMPTY).get('reference'))
+        if ref:
+            index.setdefault(ref, att)
+    return index
 
-    att_parties_norm = _get_att_counterparties(att)
-    if not att_parties_norm:
-        # Attachment has no counterparty names, so we can't check.
-        return False
 
-    # Check if the transaction's contact is in the set of attachment counterparties
-    if tx_party_norm in att_parties_norm:
-        return True
+def build_transaction_index(transactions: List[Transaction]) -> Dict[str, Transaction]:
+    """
+    Maps each normalized transaction reference to its transaction.
 
-    return False
+    The inverse of build_attachment_index(), for use with find_transaction().
+    """
+    index: Dict[str, Transaction] = {}
+    for tx in transactions:
+        ref = _normalize_ref(tx.get('reference'))
+        if ref:
+            index.setdefault(ref, tx)
+    return index
 
 
 # --- Core matcher ---------------------------------------------------------
 
-def _find_best_match(
-    item_to_match: Union[Transaction, Attachment],
-    candidates: List[Union[Transaction, Attachment]],
-    is_tx_to_att: bool
+def _pick_best_candidate(
+    item: _Prepared,
+    prepared: List[_Prepared]
 ) -> Optional[Union[Transaction, Attachment]]:
     """
-    The central matching engine used for both directions:
-        transaction -> attachment
-        attachment -> transaction
+    Stages 2 and 3 of the matching pipeline, shared by both directions.
+
+    Works only on prepared records, whose signals are symmetric
+    (a transaction simply has at most one date and one counterparty name),
+    so it does not need to know which side is the transaction.
 
     Workflow:
-      1. Tries reference number matching.
-      2. If that fails, compute a 0–3 heuristic score.
-      3. Apply confidence + ambiguity rules.
-      4. Return the single best candidate or None.
+      1. Compute a 0–3 heuristic score per candidate.
+      2. Apply confidence + ambiguity rules.
+      3. Return the single best candidate or None.
     """
-
-    # ----------------------------------------------------------------------
-    # Stage 1: Reference Number Match (Golden Match)
-    # This is the highest-confidence signal. If it matches, we stop and return immediately because it's a guaranteed 1:1 match.
-    # ----------------------------------------------------------------------
-
-    # Get the normalized reference from the item being matched.
-    if is_tx_to_att:
-        # Matching a TX to many ATTs. The item_to_match is a Transaction.
-        ref_to_match = _normalize_ref(item_to_match.get('reference'))
-    else:
-        # Matching an ATTs to many TXs. The item_to_match is an Attachment.
-        ref_to_match = _normalize_ref(item_to_match.get('data', {}).get('reference'))
-
-    # Attempt direct 1:1 matching against candidate references.
-    if ref_to_match:
-        for candidate in candidates:
-            if is_tx_to_att:
-                # The candidate is an Attachment
-                candidate_data = candidate.get('data', {})
-                candidate_ref = _normalize_ref(candidate_data.get('reference'))
-            else:
-                # The candidate is a Transaction
-                candidate_ref = _normalize_ref(candidate.get('reference'))
-
-            if candidate_ref and ref_to_match == candidate_ref:
-                return candidate    # deterministic golden match
+    _, item_amount, item_dates, item_parties, _ = item
 
     # ----------------------------------------------------------------------
     # Stage 2: Heuristic scoring
     # No reference match was found. Fall back to scoring based on: Amount, Date, Counterparty.
     # ----------------------------------------------------------------------
 
+    # Track only the leader and whether anyone shares its score; no list of ties is needed.
     highest_score = 0
-    best_candidates = []
+    best_candidate = None
+    is_tie = False
 
-    for candidate in candidates:
-        # Determine which object is the transaction and which is the attachment.
-        if is_tx_to_att:
-            tx, att = item_to_match, candidate
-        else:
-            tx, att = candidate, item_to_match
+    # Item-side facts are the same for every candidate; resolve them once outside the loop.
+    item_has_amount = item_amount is not None
+    item_has_parties = bool(item_parties)
+    item_window = _date_window(item_dates)
 
+    for candidate, amount, dates, parties, _ in prepared:
         # --- Calculate the match signals ---
-        amount_match = _check_amount_match(tx, att)
-        date_match = _check_date_match(tx, att)
-        name_match = _check_counterparty_match(tx, att)
+        # Cheapest and most selective first. After each signal, skip the candidate
+        # if even a perfect result on the remaining signals could not reach the leader.
+        # The bound is strict: a candidate that could still tie must be scored (ties mean ambiguity).
+        amount_match = item_has_amount and item_amount == amount
+        if amount_match + 2 < highest_score:
+            continue
+
+        date_match = not item_window.isdisjoint(dates)
+        if amount_match + date_match + 1 < highest_score:
+            continue    # the veto can only lower the score, so it is safe to skip as well
+
+        name_match = not item_parties.isdisjoint(parties)
 
         # --- VETO LOGIC ---
         # This is the critical rule to prevent false positives like Tx 2006.
 
         # Determine if a meaningful name comparison was possible.
-        tx_name_norm = _normalize_name(tx.get('contact'))
-        att_names_norm = _get_att_counterparties(att)
-        name_check_possible = tx_name_norm is not None and len(att_names_norm) > 0
+        name_check_possible = item_has_parties and bool(parties)
 
         # If a name check *was* possible but it *failed*...
         if name_check_possible and not name_match:
             score = 0  # VETO! This is a clear mismatch.
         else:
-            # No veto. Proceed with normal scoring.
-            score = 0
-            if amount_match: score += 1
-            if date_match: score += 1
-            if name_match: score += 1
+            # No veto. Each agreeing signal adds one point (bools sum as 0/1).
+            score = amount_match + date_match + name_match
         # --- End Veto Logic ---
 
-        # Track best-scoring candidates
+        # Track the best-scoring candidate
         if score > highest_score:
             highest_score = score
-            best_candidates = [candidate]  # New highest score, reset list
-        elif score == highest_score:
-            best_candidates.append(candidate) # Add to list of ties
+            best_candidate = candidate  # New highest score, clears any earlier tie
+            is_tie = False
+        elif score == highest_score and score > 0:
+            is_tie = True
+
+            # Two perfect scores can never be separated: the result is already ambiguous.
+            if highest_score == MAX_SCORE:
+                return None
 
     # ----------------------------------------------------------------------
     # Stage 3: Return based on Confidence & Ambiguity
@@ -303,41 +401,402 @@ def _find_best_match(
     # 2. There is "exactly one" best candidate (no ambiguity/ties)
     # ----------------------------------------------------------------------
 
-    if highest_score >= CONFIDENCE_THRESHOLD and len(best_candidates) == 1:
-        return best_candidates[0]
+    if highest_score >= CONFIDENCE_THRESHOLD and not is_tie:
+        return best_candidate
 
     return None    # uncertainty -> no match
 
 
+def _find_att_for_tx(
+    tx: Transaction,
+    attachments: List[Attachment],
+    ref_index: Optional[Dict[str, Attachment]] = None,
+    prepared: Optional[List[_Prepared]] = None
+) -> Optional[Attachment]:
+    """
+    The matching engine for the transaction -> attachment direction.
+
+    Workflow:
+      1. Tries reference number matching.
+      2. If that fails, falls back to heuristic scoring (see _pick_best_candidate).
+
+    `ref_index` maps normalized references to attachments (see build_attachment_index()).
+    `prepared` holds the prepared `attachments`, in the same order.
+    Both are built from `attachments` when not given; batch callers pass them in to build them only once.
+    """
+    item = _prepare_transaction(tx)
+
+    # ----------------------------------------------------------------------
+    # Stage 1: Reference Number Match (Golden Match)
+    # This is the highest-confidence signal. If it matches, we stop and return immediately because it's a guaranteed 1:1 match.
+    # ----------------------------------------------------------------------
+    _, _, _, _, ref_to_match = item
+    if ref_to_match:
+        if ref_index is None:
+            ref_index = build_attachment_index(attachments)
+
+        hit = ref_index.get(ref_to_match)
+        if hit is not None:
+            return hit    # deterministic golden match
+
+    if prepared is None:
+        prepared = [_prepare_attachment(att) for att in attachments]
+
+    return _pick_best_candidate(item, prepared)
+
+
+def _find_tx_for_att(
+    att: Attachment,
+    transactions: List[Transaction],
+    ref_index: Optional[Dict[str, Transaction]] = None,
+    prepared: Optional[List[_Prepared]] = None
+) -> Optional[Transaction]:
+    """
+    The matching engine for the attachment -> transaction direction.
+    Mirrors _find_att_for_tx() with the roles swapped.
+    """
+    item = _prepare_attachment(att)
+
+    # Stage 1: Reference Number Match (Golden Match)
+    _, _, _, _, ref_to_match = item
+    if ref_to_match:
+        if ref_index is None:
+            ref_index = build_transaction_index(transactions)
+
+        hit = ref_index.get(ref_to_match)
+        if hit is not None:
+            return hit    # deterministic golden match
+
+    if prepared is None:
+        prepared = [_prepare_transaction(tx) for tx in transactions]
+
+    return _pick_best_candidate(item, prepared)
+
+
 # --- Public Functions (as required by run.py) -------------------------------------------
 
 def find_attachment(
         transaction: Transaction,
-        attachments: List[Attachment]
+        attachments: List[Attachment],
+        index: Optional[Dict[str, Attachment]] = None
 ) -> Optional[Attachment]:
     """
     Finds the single best attachment for a given transaction.
 
-    This is a "wrapper" function that calls the main matching engine.
+    This is a "wrapper" function that calls the Tx -> Att matching engine.
+    Pass a prebuilt `index` (see build_attachment_index) when matching many transactions against the same attachments.
     """
-    return _find_best_match(
-        item_to_match=transaction,
-        candidates=attachments,
-        is_tx_to_att=True  # Set direction: Tx -> Att
-    )
+    return _find_att_for_tx(transaction, attachments, ref_index=index)
 
 
 def find_transaction(
         attachment: Attachment,
-        transactions: List[Transaction]
+        transactions: List[Transaction],
+        index: Optional[Dict[str, Transaction]] = None
 ) -> Optional[Transaction]:
     """
     Finds the single best transaction for a given attachment.
 
-    This is a "wrapper" function that calls the main matching engine.
+    This is a "wrapper" function that calls the Att -> Tx matching engine.
+    Pass a prebuilt `index` (see build_transaction_index) when matching many attachments against the same transactions.
+    """
+    return _find_tx_for_att(attachment, transactions, ref_index=index)
+
+
+# --- Batch matching ---------------------------------------------------------------------
+
+# Items handed to each worker process at a time.
+_BATCH_CHUNKSIZE = 64
+
+# Per-process state for parallel batch matching, set up once per worker by _init_batch_worker().
+_BATCH_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_batch_worker(
+        find: Callable[..., Any],
+        prepare: Callable[[Any], _Prepared],
+        build_index: Callable[[List[Any]], Dict[str, Any]],
+        candidates: List[Any]
+) -> None:
+    """
+    Runs once in every worker process: prepares and indexes the shared candidates.
+    """
+    _BATCH_WORKER_STATE.update(
+        find=find,
+        candidates=candidates,
+        ref_index=build_index(candidates),
+        prepared=[prepare(candidate) for candidate in candidates],
+        positions={id(candidate): pos for pos, candidate in enumerate(candidates)},
+    )
+
+
+def _match_in_worker(item: Union[Transaction, Attachment]) -> Optional[int]:
     """
-    return _find_best_match(
-        item_to_match=attachment,
-        candidates=transactions,
-        is_tx_to_att=False  # Set direction: Att -> Tx
+    Matches one item inside a worker process.
+
+    Returns the candidate's position rather than the candidate itself, because objects
+    sent back from a worker are copies; the parent maps positions back to its own objects.
+    """
+    state = _BATCH_WORKER_STATE
+    match = state['find'](item, state['candidates'], state['ref_index'], state['prepared'])
+    return None if match is None else state['positions'][id(match)]
+
+
+def _match_batch(
+        find: Callable[..., Any],
+        prepare: Callable[[Any], _Prepared],
+        build_index: Callable[[List[Any]], Dict[str, Any]],
+        items: List[Any],
+        candidates: List[Any],
+        max_workers: int
+) -> List[Any]:
+    """
+    Matches every item against the same candidates, which are prepared and indexed only once.
+    Each item is matched independently, so the work can be split across processes.
+    """
+    if max_workers > 1 and len(items) > 1:
+        with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_batch_worker,
+                initargs=(find, prepare, build_index, candidates)
+        ) as executor:
+            positions = list(executor.map(_match_in_worker, items, chunksize=_BATCH_CHUNKSIZE))
+        return [None if pos is None else candidates[pos] for pos in positions]
+
+    ref_index = build_index(candidates)
+    prepared = [prepare(candidate) for candidate in candidates]
+    return [find(item, candidates, ref_index, prepared) for item in items]
+
+
+def find_attachments_batch(
+        transactions: List[Transaction],
+        attachments: List[Attachment],
+        max_workers: int = 1
+) -> List[Optional[Attachment]]:
+    """
+    Finds the single best attachment for each transaction.
+
+    Returns the same results as calling find_attachment() for every transaction, in order,
+    but the attachments are parsed and indexed only once for the whole batch.
+    With max_workers > 1 the transactions are matched in that many worker processes.
+    """
+    return _match_batch(
+        _find_att_for_tx, _prepare_attachment, build_attachment_index,
+        transactions, attachments, max_workers
     )
+
+
+def find_transactions_batch(
+        attachments: List[Attachment],
+        transactions: List[Transaction],
+        max_workers: int = 1
+) -> List[Optional[Transaction]]:
+    """
+    Finds the single best transaction for each attachment.
+
+    The batch counterpart of find_transaction(); see find_attachments_batch().
+    """
+    return _match_batch(
+        _find_tx_for_att, _prepare_transaction, build_transaction_index,
+        attachments, transactions, max_workers
+    )
+
+
+# --- Global reconciliation --------------------------------------------------------------
+
+def _score_row(item: _Prepared, prepared: List[_Prepared]) -> List[int]:
+    """
+    Computes the full 0–3 heuristic score (veto included) of one item against every candidate.
+
+    The same rules as _pick_best_candidate(), but without its early exits,
+    because reconciliation needs every score and not just the leader.
+    """
+    _, item_amount, item_dates, item_parties, _ = item
+    item_window = _date_window(item_dates)
+
+    scores = []
+    for _, amount, dates, parties, _ in prepared:
+        if item_parties and parties and item_parties.isdisjoint(parties):
+            scores.append(0)    # VETO: both sides have names and they don't match
+            continue
+
+        amount_match = item_amount is not None and item_amount == amount
+        date_match = not item_window.isdisjoint(dates)
+        name_match = not item_parties.isdisjoint(parties)
+        scores.append(amount_match + date_match + name_match)
+
+    return scores
+
+
+def _max_weight_assignment(weights: List[List[int]]) -> List[Tuple[int, int]]:
+    """
+    Solves the assignment problem for a (rows x cols) weight matrix with the Hungarian algorithm.
+
+    Returns the (row, col) pairs of a maximum-total-weight matching, leaving out zero-weight pairs.
+    O(n^2 * m) for n = min(rows, cols), m = max(rows, cols).
+    """
+    transposed = len(weights) > len(weights[0])
+    if transposed:
+        weights = [list(col) for col in zip(*weights)]
+
+    n, m = len(weights), len(weights[0])
+    inf = float('inf')
+
+    # Potentials and matching use 1-based indices; column 0 is a virtual helper.
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    row_of = [0] * (m + 1)     # row_of[col] = row matched to col (0 = none)
+    way = [0] * (m + 1)
+
+    for row in range(1, n + 1):
+        row_of[0] = row
+        col0 = 0
+        min_v = [inf] * (m + 1)
+        used = [False] * (m + 1)
+
+        # Grow an alternating tree from `row` until a free column is reached.
+        while True:
+            used[col0] = True
+            row0 = row_of[col0]
+            delta = inf
+            col1 = 0
+            for col in range(1, m + 1):
+                if not used[col]:
+                    cur = -weights[row0 - 1][col - 1] - u[row0] - v[col]    # cost = -weight
+                    if cur < min_v[col]:
+                        min_v[col] = cur
+                        way[col] = col0
+                    if min_v[col] < delta:
+                        delta = min_v[col]
+                        col1 = col
+            for col in range(m + 1):
+                if used[col]:
+                    u[row_of[col]] += delta
+                    v[col] -= delta
+                else:
+                    min_v[col] -= delta
+            col0 = col1
+            if row_of[col0] == 0:
+                break
+
+        # Flip the augmenting path.
+        while col0:
+            col1 = way[col0]
+            row_of[col0] = row_of[col1]
+            col0 = col1
+
+    pairs = [
+        (row_of[col] - 1, col - 1)
+        for col in range(1, m + 1)
+        if row_of[col] and weights[row_of[col] - 1][col - 1] > 0
+    ]
+    if transposed:
+        pairs = [(col, row) for row, col in pairs]
+    return pairs
+
+
+def reconcile(
+        transactions: List[Transaction],
+        attachments: List[Attachment]
+) -> List[Tuple[Transaction, Attachment]]:
+    """
+    Matches a whole ledger at once, using every attachment and transaction at most once.
+
+    Calling find_attachment() per transaction has no memory between calls, so two
+    transactions can both be given the same attachment. Here the batch is solved as a
+    maximum-weight bipartite matching instead:
+
+      1. Reference (golden) matches are paired first, exactly as find_attachment() /
+         find_transaction() would pair them. Items with a golden match take no further part.
+      2. Every remaining (transaction, attachment) pair is scored 0–3 with the usual rules and veto.
+         Pairs below CONFIDENCE_THRESHOLD are dropped.
+      3. Ambiguity is handled as in the single-item functions: a pair is dropped if its
+         transaction or its attachment has another candidate with the same score.
+         This depends only on the scores, so it is applied before solving; groups in which
+         every pair is ambiguous (e.g. recurring identical payments) simply disappear.
+      4. The assignment is solved with the Hungarian algorithm, separately for each connected
+         group of candidate pairs (these groups are usually tiny). Scores are weighted so that
+         a stronger pair always wins: one 3/3 pair is never traded for several 2/3 pairs.
+
+    Returns (transaction, attachment) pairs in transaction order.
+    """
+    att_index = build_attachment_index(attachments)
+    tx_index = build_transaction_index(transactions)
+    att_position = {id(att): j for j, att in enumerate(attachments)}
+
+    matched: Dict[int, int] = {}    # transaction position -> attachment position
+
+    # --- Stage 1: golden matches ---
+    # A reference hit is authoritative, so those items are not scored heuristically.
+    # On duplicate references the first item wins, just like the lookup in the single-item functions.
+    heuristic_txs = []
+    for i, tx in enumerate(transactions):
+        tx_record = _prepare_transaction(tx)
+        _, _, _, _, ref = tx_record
+        if ref and ref in att_index:
+            if tx_index[ref] is tx:
+                matched[i] = att_position[id(att_index[ref])]
+        else:
+            heuristic_txs.append((i, tx_record))
+
+    heuristic_atts = []
+    for j, att in enumerate(attachments):
+        att_record = _prepare_attachment(att)
+        _, _, _, _, ref = att_record
+        if not (ref and ref in tx_index):
+            heuristic_atts.append((j, att_record))
+
+    # --- Stage 2: score the remaining pairs, keeping confident ones only ---
+    att_records = [record for _, record in heuristic_atts]
+    edges: Dict[Tuple[int, int], int] = {}
+    for i, tx_record in heuristic_txs:
+        for (j, _), score in zip(heuristic_atts, _score_row(tx_record, att_records)):
+            if score >= CONFIDENCE_THRESHOLD:
+                edges[(i, j)] = score
+
+    # --- Stage 3: drop ambiguous pairs ---
+    # Ambiguity depends only on the scores, so ambiguous pairs are removed up front.
+    # Otherwise the solver could spend their rows/columns and block pairs that are not ambiguous.
+    row_counts = Counter((i, score) for (i, _), score in edges.items())
+    col_counts = Counter((j, score) for (_, j), score in edges.items())
+    edges = {
+        (i, j): score for (i, j), score in edges.items()
+        if row_counts[(i, score)] == 1 and col_counts[(j, score)] == 1
+    }
+
+    # --- Stage 4: solve each connected group of candidate pairs ---
+    tx_neighbours: Dict[int, List[int]] = {}
+    att_neighbours: Dict[int, List[int]] = {}
+    for i, j in edges:
+        tx_neighbours.setdefault(i, []).append(j)
+        att_neighbours.setdefault(j, []).append(i)
+
+    seen_txs = set()
+    for start in tx_neighbours:
+        if start in seen_txs:
+            continue
+
+        # Collect the group with a breadth-first walk over the bipartite graph.
+        group_txs, group_atts = [start], []
+        seen_txs.add(start)
+        seen_atts = set()
+        for i in group_txs:     # group_txs grows while it is iterated
+            for j in tx_neighbours[i]:
+                if j not in seen_atts:
+                    seen_atts.add(j)
+                    group_atts.append(j)
+                    for other in att_neighbours[j]:
+                        if other not in seen_txs:
+                            seen_txs.add(other)
+                            group_txs.append(other)
+
+        # Lexicographic weights: one score-3 pair outweighs every score-2 pair in the group combined.
+        base = len(group_txs) + 1
+        weights = [
+            [base ** (edges[(i, j)] - CONFIDENCE_THRESHOLD) if (i, j) in edges else 0 for j in group_atts]
+            for i in group_txs
+        ]
+        for row, col in _max_weight_assignment(weights):
+            matched[group_txs[row]] = group_atts[col]
+
+    return [(transactions[i], attachments[matched[i]]) for i in sorted(matched)]
@@ -0,0 +1,202 @@
+"""Tests for src/match.py: name normalization, input robustness, batch matching and reconcile.
+
+Run from the repository root with: python -m unittest
+"""
+
+import itertools
+import json
+import random
+import string
+import unittest
+from pathlib import Path
+
+from src.match import (
+    _PUNCT_RE, _SUFFIX_RE, _max_weight_assignment, _normalize_name,
+    find_attachment, find_attachments_batch, find_transaction, find_transactions_batch, reconcile,
+)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "src" / "data"
+
+
+def _load_fixtures():
+    with open(DATA_DIR / "transactions.json", encoding="utf-8") as f:
+        transactions = json.load(f)
+    with open(DATA_DIR / "attachments.json", encoding="utf-8") as f:
+        attachments = json.load(f)
+    return transactions, attachments
+
+
+def _brute_force_best(weights):
+    """Highest total weight of any matching, by trying every assignment."""
+    rows, cols = len(weights), len(weights[0])
+    if rows <= cols:
+        return max(
+            sum(weights[i][perm[i]] for i in range(rows))
+            for perm in itertools.permutations(range(cols), rows)
+        )
+    return max(
+        sum(weights[perm[j]][j] for j in range(cols))
+        for perm in itertools.permutations(range(rows), cols)
+    )
+
+
+def _tx(tx_id, amount, contact=None, date="2024-06-01", reference=None):
+    return {"id": tx_id, "date": date, "amount": amount, "contact": contact, "reference": reference}
+
+
+def _att(att_id, amount, supplier=None, date="2024-06-01", reference=None, recipient=None):
+    return {
+        "id": att_id,
+        "data": {
+            "invoicing_date": date, "total_amount": amount,
+            "supplier": supplier, "recipient": recipient, "reference": reference,
+        },
+    }
+
+
+def _ids(pairs):
+    return [(tx["id"], att["id"]) for tx, att in pairs]
+
+
+class BatchTest(unittest.TestCase):
+
+    def _assert_same_objects(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for got, want in zip(actual, expected):
+            self.assertIs(got, want)
+
+    def test_batch_returns_the_same_objects_as_single_item_calls(self):
+        transactions, attachments = _load_fixtures()
+        expected_atts = [find_attachment(tx, attachments) for tx in transactions]
+        expected_txs = [find_transaction(att, transactions) for att in attachments]
+
+        for max_workers in (1, 2):
+            with self.subTest(max_workers=max_workers):
+                self._assert_same_objects(
+                    find_attachments_batch(transactions, attachments, max_workers=max_workers), expected_atts
+                )
+                self._assert_same_objects(
+                    find_transactions_batch(attachments, transactions, max_workers=max_workers), expected_txs
+                )
+
+
+class MaxWeightAssignmentTest(unittest.TestCase):
+
+    def test_matches_brute_force_on_random_matrices(self):
+        rnd = random.Random(0)
+        for _ in range(500):
+            rows, cols = rnd.randint(1, 5), rnd.randint(1, 5)
+            weights = [[rnd.choice([0, 0, 1, 2, 5]) for _ in range(cols)] for _ in range(rows)]
+
+            pairs = _max_weight_assignment(weights)
+
+            self.assertEqual(sum(weights[i][j] for i, j in pairs), _brute_force_best(weights), weights)
+            self.assertEqual(len({i for i, _ in pairs}), len(pairs))
+            self.assertEqual(len({j for _, j in pairs}), len(pairs))
+
+    def test_leaves_out_zero_weight_pairs(self):
+        self.assertEqual(_max_weight_assignment([[0, 0], [0, 3]]), [(1, 1)])
+        self.assertEqual(_max_weight_assignment([[0], [0]]), [])
+
+    def test_handles_more_rows_than_columns(self):
+        self.assertEqual(_max_weight_assignment([[1], [4], [2]]), [(1, 0)])
+
+
+def _normalize_name_with_regex(name):
+    """The regex-only normalization that the ASCII fast path of _normalize_name must reproduce."""
+    name = _PUNCT_RE.sub(' ', _SUFFIX_RE.sub('', name.lower())).strip()
+    return name or None
+
+
+class NormalizeNameTest(unittest.TestCase):
+
+    def test_ascii_fast_path_matches_regex_path(self):
+        for name in ["ab_c", "x_oy", "Acme, Oy.", "oy_", "_oy", "Doe Media Oy", "AB", "Oy's", "Ltd.-Inc", "tmi\tgmbh x"]:
+            self.assertEqual(_normalize_name(name), _normalize_name_with_regex(name), name)
+
+        rnd = random.Random(0)
+        alphabet = list(string.printable) + ["\x00", "\x1c", "\x7f", "_", "-"] + ["oy", "OY", "ab", "Ltd", "inc", "GmbH", "tmi", " Oy"] * 5
+        for _ in range(20000):
+            name = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 12)))
+            self.assertEqual(_normalize_name(name), _normalize_name_with_regex(name), repr(name))
+
+    def test_non_ascii_names_keep_nordic_characters(self):
+        self.assertEqual(_normalize_name("Öljy-Mäki Oy"), "öljy mäki")
+
+
+class NonStringFieldsTest(unittest.TestCase):
+
+    def test_non_string_contact_and_parties_are_treated_as_missing(self):
+        transaction = _tx(1, 50, contact=12345, reference="123")
+        attachment = _att(10, 50, supplier=["Jane"], reference="123")
+
+        self.assertIs(find_attachment(transaction, [attachment]), attachment)
+        self.assertIs(find_transaction(attachment, [transaction]), transaction)
+        self.assertIs(find_attachment(_tx(2, 50, contact={"name": "Jane"}), [attachment]), attachment)
+
+
+class ReconcileTest(unittest.TestCase):
+
+    def test_fixture_ledger(self):
+        transactions, attachments = _load_fixtures()
+
+        self.assertEqual(
+            _ids(reconcile(transactions, attachments)),
+            [(2001, 3001), (2002, 3002), (2003, 3003), (2004, 3004), (2005, 3005), (2007, 3006), (2008, 3007)],
+        )
+
+    def test_reference_match_wins(self):
+        transactions = [_tx(1, 10, reference="00 123")]
+        attachments = [_att(10, 10, supplier="Other Oy"), _att(11, 99, reference="123")]
+
+        self.assertEqual(_ids(reconcile(transactions, attachments)), [(1, 11)])
+
+    def test_each_attachment_is_used_once(self):
+        # Both transactions would get attachment 10 from find_attachment(); only the 3/3 one keeps it.
+        transactions = [_tx(1, 50, contact="Jane"), _tx(2, 50)]
+        attachments = [_att(10, 50, supplier="Jane")]
+
+        self.assertEqual(_ids(reconcile(transactions, attachments)), [(1, 10)])
+
+    def test_strong_pair_is_not_traded_for_two_weaker_pairs(self):
+        # 1-10 scores 3; 1-11 and 2-10 score 2 each. The 3/3 pair must win.
+        transactions = [_tx(1, 50, contact="Jane"), _tx(2, 50)]
+        attachments = [_att(10, 50, supplier="Jane"), _att(11, None, supplier="Jane")]
+
+        self.assertEqual(_ids(reconcile(transactions, attachments)), [(1, 10)])
+
+    def test_counterparty_veto(self):
+        transactions = [_tx(1, 35, contact="Matti Meittiläinen")]
+        attachments = [_att(10, 35, supplier="Matti Meikäläinen")]
+
+        self.assertEqual(reconcile(transactions, attachments), [])
+
+    @staticmethod
+    def _ambiguous_leader_ledger():
+        # t1 scores 3 against both attachments (ambiguous), t2 and t3 each score 2 against one.
+        transactions = [_tx(1, 50, contact="Jane"), _tx(2, 99, contact="Bob"), _tx(3, 99, contact="Carl")]
+        attachments = [_att(10, 50, supplier="Jane", recipient="Bob"), _att(11, 50, supplier="Jane", recipient="Carl")]
+        return transactions, attachments
+
+    def test_ambiguous_pairs_do_not_block_unambiguous_ones(self):
+        transactions, attachments = self._ambiguous_leader_ledger()
+
+        self.assertEqual(_ids(reconcile(transactions, attachments)), [(2, 10), (3, 11)])
+
+    def test_result_does_not_depend_on_input_order(self):
+        transactions, attachments = self._ambiguous_leader_ledger()
+
+        for tx_order in itertools.permutations(transactions):
+            for att_order in itertools.permutations(attachments):
+                pairs = reconcile(list(tx_order), list(att_order))
+                self.assertEqual(sorted(_ids(pairs)), [(2, 10), (3, 11)], (tx_order, att_order))
+
+    def test_identical_recurring_payments_are_ambiguous(self):
+        transactions = [_tx(i, -10, contact="Netflix") for i in range(50)]
+        attachments = [_att(100 + i, 10, supplier="Netflix") for i in range(50)]
+
+        self.assertEqual(reconcile(transactions, attachments), [])
+
+
+if __name__ == "__main__":
+    unittest.main()